@@ -1,6 +1,7 @@
 import streamlit as st
 import pandas as pd
 import numpy as np
+import os
 from datetime import datetime
 
 # ============================================================
@@ -17,13 +18,30 @@ M_CH4 = 16.04                 # g/mol
 M_N2O = 44.01                 # g/mol
 M_C = 12.01                   # g/mol
 M_N = 14.01                   # g/mol
+GWP_CH4 = 25                  # kg CO₂-eq/kg (GWP 100 anos)
+GWP_N2O = 298                 # kg CO₂-eq/kg (GWP 100 anos)
+
+# Visualização
+MAX_PONTOS_GRAFICO = 5000     # pontos por série enviados ao navegador
 
 # ============================================================
 # CARREGAMENTO DOS DADOS
 # ============================================================
+# Tipos declarados das colunas do CSV (P_Pa e T_K são opcionais)
+TIPOS_COLUNAS = {'CH4_ppm': 'float64', 'N2O_ppm': 'float64', 'P_Pa': 'float64', 'T_K': 'float64'}
+
+@st.cache_data
+def carregar_dados(caminho, modificado_em):
+    """Lê o CSV do cromatógrafo; `modificado_em` (mtime) invalida o cache quando o arquivo muda."""
+    try:
+        # Leitor nativo do PyArrow (multithread); cai no leitor C do pandas se não houver pyarrow
+        dados = pd.read_csv(caminho, parse_dates=['timestamp'], dtype=TIPOS_COLUNAS, engine='pyarrow')
+    except ImportError:
+        dados = pd.read_csv(caminho, parse_dates=['timestamp'], dtype=TIPOS_COLUNAS)
+    return dados.set_index('timestamp')
+
 try:
-    dados = pd.read_csv('dados_cromatografo.csv', parse_dates=['timestamp'])
-    dados.set_index('timestamp', inplace=True)
+    dados = carregar_dados('dados_cromatografo.csv', os.path.getmtime('dados_cromatografo.csv'))
     st.success("✅ Arquivo 'dados_cromatografo.csv' carregado!")
 except FileNotFoundError:
     st.error("❌ Arquivo 'dados_cromatografo.csv' não encontrado. Certifique-se de que ele está na mesma pasta do app.")
@@ -89,9 +107,16 @@ dados['massa_N2O_g'] = dados['N2O_mol'] * n_total * M_N2O
 dados['massa_CH4_mg'] = dados['massa_CH4_g'] * 1000
 dados['massa_N2O_mg'] = dados['massa_N2O_g'] * 1000
 
-st.line_chart(dados[['massa_CH4_mg', 'massa_N2O_mg']])
-st.write("Massa média CH₄ (mg):", round(dados['massa_CH4_mg'].mean(), 6))
-st.write("Massa média N₂O (mg):", round(dados['massa_N2O_mg'].mean(), 6))
+serie_massas = dados[['massa_CH4_mg', 'massa_N2O_mg']]
+if len(serie_massas) > MAX_PONTOS_GRAFICO:
+    # Decimação por passo fixo: o gráfico só precisa da forma da série, não de cada leitura
+    passo = int(np.ceil(len(serie_massas) / MAX_PONTOS_GRAFICO))
+    serie_massas = serie_massas.iloc[::passo]
+st.line_chart(serie_massas)
+st.markdown(
+    f"Massa média CH₄ (mg): `{round(dados['massa_CH4_mg'].mean(), 6)}`\n\n"
+    f"Massa média N₂O (mg): `{round(dados['massa_N2O_mg'].mean(), 6)}`"
+)
 
 # ============================================================
 # SEÇÃO 5: MÉTODO DE CÂMARA DE FLUXO CONTÍNUO (YANG ET AL.)
@@ -119,35 +144,28 @@ with col2:
 
 Q_total_m3h = Q_sw * 60 / 1000  # L/min → m³/h
 
-dados['data'] = dados.index.date
-fluxos_dia = []
+dados['data'] = dados.index.normalize()
+medias_dia = dados.groupby('data')[['CH4_ppm', 'N2O_ppm', 'P_Pa', 'T_K']].mean()
 
-for dia, grupo in dados.groupby('data'):
-    C_ch4_ppm = grupo['CH4_ppm'].mean()
-    C_n2o_ppm = grupo['N2O_ppm'].mean()
-    P_media_dia = grupo['P_Pa'].mean()
-    T_media_dia = grupo['T_K'].mean()
-    
-    P_RT = P_media_dia / (R * T_media_dia)   # mol/m³
-    C_ch4_mg_m3 = C_ch4_ppm * 1e-6 * P_RT * M_CH4 * 1000
-    C_n2o_mg_m3 = C_n2o_ppm * 1e-6 * P_RT * M_N2O * 1000
-    
-    fluxo_ch4 = (C_ch4_mg_m3 * Q_total_m3h) / area_camara_yang
-    fluxo_n2o = (C_n2o_mg_m3 * Q_total_m3h) / area_camara_yang
-    
-    fluxos_dia.append({
-        'data': dia,
-        'fluxo_CH4_mg': fluxo_ch4,
-        'fluxo_N2O_mg': fluxo_n2o,
-    })
+P_RT = medias_dia['P_Pa'] / (R * medias_dia['T_K'])   # mol/m³
+C_ch4_mg_m3 = medias_dia['CH4_ppm'] * 1e-6 * P_RT * M_CH4 * 1000
+C_n2o_mg_m3 = medias_dia['N2O_ppm'] * 1e-6 * P_RT * M_N2O * 1000
 
-df_fluxos = pd.DataFrame(fluxos_dia).sort_values('data')
-df_fluxos['data'] = pd.to_datetime(df_fluxos['data'])
+df_fluxos = pd.DataFrame({
+    'fluxo_CH4_mg': (C_ch4_mg_m3 * Q_total_m3h) / area_camara_yang,
+    'fluxo_N2O_mg': (C_n2o_mg_m3 * Q_total_m3h) / area_camara_yang,
+}).rename_axis('data').reset_index()
 
 st.write("Fluxos calculados por dia de medição:")
 st.dataframe(df_fluxos)
 st.line_chart(df_fluxos.set_index('data')[['fluxo_CH4_mg', 'fluxo_N2O_mg']])
 
+# Intervalo (dias) até a medição seguinte, usado pelas seções 2 e 6;
+# a última medição recebe a mediana dos intervalos
+intervalo_dias = (df_fluxos['data'].shift(-1) - df_fluxos['data']).dt.days
+if not intervalo_dias.empty:
+    intervalo_dias.iloc[-1] = intervalo_dias.median()
+
 # ============================================================
 # SEÇÃO 2: PERDA ACUMULADA DE C E N (BASEADA NOS FLUXOS DIÁRIOS)
 # ============================================================
@@ -156,17 +174,8 @@ st.header("2. Perda de C e N (base acumulada)")
 if df_fluxos.empty:
     st.warning("Calcule os fluxos diários na seção 5 primeiro.")
 else:
-    df_temp = df_fluxos.copy()
-    df_temp['data_prox'] = df_temp['data'].shift(-1)
-    df_temp['intervalo_dias'] = (df_temp['data_prox'] - df_temp['data']).dt.days
-    ultimo_intervalo = df_temp['intervalo_dias'].median()
-    df_temp.loc[df_temp.index[-1], 'intervalo_dias'] = ultimo_intervalo
-    
-    df_temp['massa_CH4_kg'] = df_temp['fluxo_CH4_mg'] * 1e-6 * area_reator * df_temp['intervalo_dias'] * 24
-    df_temp['massa_N2O_kg'] = df_temp['fluxo_N2O_mg'] * 1e-6 * area_reator * df_temp['intervalo_dias'] * 24
-    
-    total_CH4_kg = df_temp['massa_CH4_kg'].sum()
-    total_N2O_kg = df_temp['massa_N2O_kg'].sum()
+    total_CH4_kg = (df_fluxos['fluxo_CH4_mg'] * 1e-6 * area_reator * intervalo_dias * 24).sum()
+    total_N2O_kg = (df_fluxos['fluxo_N2O_mg'] * 1e-6 * area_reator * intervalo_dias * 24).sum()
     
     C_perdido = total_CH4_kg * (M_C / M_CH4)
     N_perdido = total_N2O_kg * (2 * M_N / M_N2O)
@@ -198,50 +207,44 @@ else:
 # ============================================================
 st.header("6. Comparação com Yang et al. 2017 (opcional)")
 
-if st.checkbox("Calcular emissões acumuladas (necessário área do reator e intervalos entre medições)"):
-    area_reator_comp = st.number_input("Área da base do reator (m²)", value=area_reator, step=0.1, key="area_reator_comp")
-    
-    df_temp = df_fluxos.copy()
-    df_temp['data_prox'] = df_temp['data'].shift(-1)
-    df_temp['data_prox'] = pd.to_datetime(df_temp['data_prox'])
-    df_temp['intervalo_dias'] = (df_temp['data_prox'] - df_temp['data']).dt.days
-    ultimo_intervalo = df_temp['intervalo_dias'].median()
-    df_temp.loc[df_temp.index[-1], 'intervalo_dias'] = ultimo_intervalo
-    
-    df_temp['massa_CH4_kg'] = df_temp['fluxo_CH4_mg'] * 1e-6 * area_reator_comp * df_temp['intervalo_dias'] * 24
-    df_temp['massa_N2O_kg'] = df_temp['fluxo_N2O_mg'] * 1e-6 * area_reator_comp * df_temp['intervalo_dias'] * 24
-    
-    total_CH4_kg = df_temp['massa_CH4_kg'].sum()
-    total_N2O_kg = df_temp['massa_N2O_kg'].sum()
-    
-    st.write(f"**Emissão total de CH₄:** {total_CH4_kg:.4f} kg")
-    st.write(f"**Emissão total de N₂O:** {total_N2O_kg:.4f} kg")
-    
-    C_perdido = total_CH4_kg * (M_C / M_CH4)
-    N_perdido = total_N2O_kg * (2 * M_N / M_N2O)
-    
-    st.write(f"Massa seca total (da sidebar): {massa_seca_kg:.2f} kg")
-    C_inicial_kg = massa_seca_kg * (teor_c_perc / 100)
-    N_inicial_kg = massa_seca_kg * (teor_n_gkg / 1000)
-    
-    perc_C = (C_perdido / C_inicial_kg) * 100
-    perc_N = (N_perdido / N_inicial_kg) * 100
-    
-    st.write(f"**Carbono perdido como CH₄:** {C_perdido:.4f} kg ({perc_C:.3f}% do C inicial)")
-    st.write(f"**Yang et al. (2017) - valores corrigidos:** 0,0134%")
-    st.write(f"**Nitrogênio perdido como N₂O:** {N_perdido:.4f} kg ({perc_N:.3f}% do N inicial)")
-    st.write(f"**Yang et al. (2017) - valores corrigidos:** 0,0924%")
-    
-    GWP_CH4 = 25
-    GWP_N2O = 298
-    CO2eq_CH4 = total_CH4_kg * GWP_CH4
-    CO2eq_N2O = total_N2O_kg * GWP_N2O
-    CO2eq_total = CO2eq_CH4 + CO2eq_N2O
-    CO2eq_por_t = CO2eq_total / (massa_seca_kg / 1000) if massa_seca_kg > 0 else 0
-    
-    st.write(f"**Emissão total de GEE:** {CO2eq_total:.2f} kg CO₂-eq")
-    st.write(f"**Emissão por tonelada de MS:** {CO2eq_por_t:.2f} kg CO₂-eq/t MS")
-    st.write(f"**Yang et al. (2017) - valores corrigidos:** 8,1 kg CO₂-eq/t MS")
+# Fragmento: alterar os widgets desta seção reexecuta só ela, não o app inteiro
+@st.fragment
+def secao_comparacao(df_fluxos, intervalo_dias, area_reator, massa_seca_kg, teor_c_perc, teor_n_gkg):
+    if st.checkbox("Calcular emissões acumuladas (necessário área do reator e intervalos entre medições)"):
+        area_reator_comp = st.number_input("Área da base do reator (m²)", value=area_reator, step=0.1, key="area_reator_comp")
+    
+        total_CH4_kg = (df_fluxos['fluxo_CH4_mg'] * 1e-6 * area_reator_comp * intervalo_dias * 24).sum()
+        total_N2O_kg = (df_fluxos['fluxo_N2O_mg'] * 1e-6 * area_reator_comp * intervalo_dias * 24).sum()
+    
+        C_perdido = total_CH4_kg * (M_C / M_CH4)
+        N_perdido = total_N2O_kg * (2 * M_N / M_N2O)
+    
+        C_inicial_kg = massa_seca_kg * (teor_c_perc / 100)
+        N_inicial_kg = massa_seca_kg * (teor_n_gkg / 1000)
+    
+        perc_C = (C_perdido / C_inicial_kg) * 100
+        perc_N = (N_perdido / N_inicial_kg) * 100
+    
+        CO2eq_CH4 = total_CH4_kg * GWP_CH4
+        CO2eq_N2O = total_N2O_kg * GWP_N2O
+        CO2eq_total = CO2eq_CH4 + CO2eq_N2O
+        CO2eq_por_t = CO2eq_total / (massa_seca_kg / 1000) if massa_seca_kg > 0 else 0
+    
+        # Um único bloco markdown em vez de um st.write por linha (uma mensagem ao navegador)
+        st.markdown("\n\n".join([
+            f"**Emissão total de CH₄:** {total_CH4_kg:.4f} kg",
+            f"**Emissão total de N₂O:** {total_N2O_kg:.4f} kg",
+            f"Massa seca total (da sidebar): {massa_seca_kg:.2f} kg",
+            f"**Carbono perdido como CH₄:** {C_perdido:.4f} kg ({perc_C:.3f}% do C inicial)",
+            "**Yang et al. (2017) - valores corrigidos:** 0,0134%",
+            f"**Nitrogênio perdido como N₂O:** {N_perdido:.4f} kg ({perc_N:.3f}% do N inicial)",
+            "**Yang et al. (2017) - valores corrigidos:** 0,0924%",
+            f"**Emissão total de GEE:** {CO2eq_total:.2f} kg CO₂-eq",
+            f"**Emissão por tonelada de MS:** {CO2eq_por_t:.2f} kg CO₂-eq/t MS",
+            "**Yang et al. (2017) - valores corrigidos:** 8,1 kg CO₂-eq/t MS",
+        ]))
+
+secao_comparacao(df_fluxos, intervalo_dias, area_reator, massa_seca_kg, teor_c_perc, teor_n_gkg)
 
 # ============================================================
 # RODAPÉ